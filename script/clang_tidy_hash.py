@@ -132,6 +132,20 @@ def write_hash(hash_value: str, repo_root: Path | None = None) -> None:
     write_file_content(hash_file, hash_value.strip() + "\n")
 
 
+def is_full_scan_needed(repo_root: Path | None = None) -> bool:
+    """Check if a full clang-tidy scan is needed.
+
+    A full scan is needed if the configuration hash changed or if
+    .clang-tidy.hash was updated in this PR.
+    """
+    hash_changed = calculate_clang_tidy_hash(repo_root) != read_stored_hash(repo_root)
+
+    # Lazy import to avoid requiring dependencies that aren't needed for other modes
+    from helpers import changed_files
+
+    return hash_changed or ".clang-tidy.hash" in changed_files()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Manage clang-tidy configuration hash")
     parser.add_argument(
@@ -151,23 +165,15 @@ def main() -> None:
 
     args = parser.parse_args()
 
-    current_hash = calculate_clang_tidy_hash()
-    stored_hash = read_stored_hash()
-
     if args.check:
-        # Check if hash changed OR if .clang-tidy.hash was updated in this PR
         # This is used in CI to determine if a full clang-tidy scan is needed
-        hash_changed = current_hash != stored_hash
-
-        # Lazy import to avoid requiring dependencies that aren't needed for other modes
-        from helpers import changed_files  # noqa: E402
-
-        hash_file_updated = ".clang-tidy.hash" in changed_files()
-
         # Exit 0 if full scan needed
-        sys.exit(0 if (hash_changed or hash_file_updated) else 1)
+        sys.exit(0 if is_full_scan_needed() else 1)
+
+    current_hash = calculate_clang_tidy_hash()
+    stored_hash = read_stored_hash()
 
-    elif args.verify:
+    if args.verify:
         # Verify that hash file is up to date with current configuration
         # This is used in pre-commit and CI checks to ensure hash was updated
         if current_hash != stored_hash:
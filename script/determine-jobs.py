@@ -44,10 +44,10 @@ from functools import cache
 import json
 import os
 from pathlib import Path
-import subprocess
 import sys
 from typing import Any
 
+from clang_tidy_hash import is_full_scan_needed
 from helpers import (
     CPP_FILE_EXTENSIONS,
     ESPHOME_TESTS_COMPONENTS_PATH,
@@ -59,7 +59,6 @@ from helpers import (
     get_all_dependencies,
     get_changed_components,
     get_component_from_path,
-    get_component_test_files,
     get_components_from_integration_fixtures,
     get_components_with_dependencies,
     get_cpp_changed_components,
@@ -199,13 +198,7 @@ def _is_clang_tidy_full_scan() -> bool:
         True if full scan is needed (hash changed), False otherwise.
     """
     try:
-        result = subprocess.run(
-            [os.path.join(root_path, "script", "clang_tidy_hash.py"), "--check"],
-            capture_output=True,
-            check=False,
-        )
-        # Exit 0 means hash changed (full scan needed)
-        return result.returncode == 0
+        return is_full_scan_needed(Path(root_path))
     except Exception:
         # If hash check fails, run full scan to be safe
         return True
@@ -225,7 +218,7 @@ def should_run_clang_tidy(branch: str | None = None) -> bool:
          and relevant platformio.ini sections
        - When configuration changes, a full scan is needed to ensure all code complies
          with the new rules
-       - Detected by script/clang_tidy_hash.py --check returning exit code 0
+       - Detected by clang_tidy_hash.is_full_scan_needed() returning True
 
     2. Any C++ source files changed
        - Any file with C++ extensions: .cpp, .h, .hpp, .cc, .cxx, .c, .tcc
@@ -256,7 +249,7 @@ def should_run_clang_tidy(branch: str | None = None) -> bool:
     if ".clang-tidy.hash" in files:
         return True
 
-    return _any_changed_file_endswith(branch, CPP_FILE_EXTENSIONS)
+    return any(file.endswith(CPP_FILE_EXTENSIONS) for file in files)
 
 
 def count_changed_cpp_files(branch: str | None = None) -> int:
@@ -349,18 +342,47 @@ def _any_changed_file_endswith(branch: str | None, extensions: tuple[str, ...])
 
 
 @cache
+def _scan_component_test_platforms() -> dict[str, frozenset[str]]:
+    """Scan tests/components once and collect the test platforms per component.
+
+    Returns:
+        Dictionary mapping component names to the platforms of their test files
+        (test.<platform>.yaml and test-<variant>.<platform>.yaml). Components
+        without test files are not included.
+    """
+    tests_dir = os.path.join(root_path, ESPHOME_TESTS_COMPONENTS_PATH)
+    component_platforms: dict[str, frozenset[str]] = {}
+    try:
+        component_dirs = os.scandir(tests_dir)
+    except FileNotFoundError:
+        return component_platforms
+
+    with component_dirs:
+        for component_dir in component_dirs:
+            if not component_dir.is_dir():
+                continue
+            with os.scandir(component_dir.path) as entries:
+                platforms = frozenset(
+                    parse_test_filename(Path(entry.name))[1]
+                    for entry in entries
+                    if entry.name.startswith(("test.", "test-"))
+                    and entry.name.endswith(".yaml")
+                )
+            if platforms:
+                component_platforms[component_dir.name] = platforms
+    return component_platforms
+
+
 def _component_has_tests(component: str) -> bool:
     """Check if a component has test files.
 
-    Cached to avoid repeated filesystem operations for the same component.
-
     Args:
         component: Component name to check
 
     Returns:
         True if the component has test YAML files
     """
-    return bool(get_component_test_files(component, all_variants=True))
+    return component in _scan_component_test_platforms()
 
 
 def _select_platform_by_preference(
@@ -531,19 +553,14 @@ def detect_memory_impact_config(
     component_platforms_map: dict[
         str, set[Platform]
     ] = {}  # Track which platforms each component supports
+    component_test_platforms = _scan_component_test_platforms()
 
     for component in sorted(changed_component_set):
-        # Look for test files on preferred platforms
-        test_files = get_component_test_files(component, all_variants=True)
-        if not test_files:
-            continue
-
         # Check if component has tests for any preferred platform
         available_platforms = [
             platform
-            for test_file in test_files
-            if (platform := parse_test_filename(test_file)[1]) != "all"
-            and platform in MEMORY_IMPACT_PLATFORM_PREFERENCE
+            for platform in component_test_platforms.get(component, ())
+            if platform in MEMORY_IMPACT_PLATFORM_PREFERENCE
         ]
 
         if not available_platforms:
@@ -646,15 +663,23 @@ def detect_memory_impact_config(
     }
 
 
-def main() -> None:
-    """Main function that determines which CI jobs to run."""
+def compute_jobs(argv: list[str] | None = None) -> dict[str, Any]:
+    """Determine which CI jobs to run.
+
+    Args:
+        argv: Command line arguments (without the program name); defaults
+            to sys.argv[1:]
+
+    Returns:
+        Dictionary describing the CI jobs, as printed by main()
+    """
     parser = argparse.ArgumentParser(
         description="Determine which CI jobs should run based on changed files"
     )
     parser.add_argument(
         "-b", "--branch", help="Branch to compare changed files against"
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Determine what should run
     run_integration = should_run_integration_tests(args.branch)
@@ -728,11 +753,10 @@ def main() -> None:
             # This accounts for component dependencies, not just directly changed files
             if changed_components:
                 # Count C++ files in all changed components (including dependencies)
-                all_cpp_files = list(git_ls_files(["*.cpp"]).keys())
                 component_set = set(changed_components)
                 files_to_check_count = sum(
                     1
-                    for f in all_cpp_files
+                    for f in git_ls_files(["*.cpp"])
                     if get_component_from_path(f) in component_set
                 )
             else:
@@ -803,8 +827,13 @@ def main() -> None:
         "component_test_batches": component_test_batches,
     }
 
+    return output
+
+
+def main() -> None:
+    """Main function that determines which CI jobs to run."""
     # Output as JSON
-    print(json.dumps(output))
+    print(json.dumps(compute_jobs()))
 
 
 if __name__ == "__main__":
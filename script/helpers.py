@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from functools import cache
 import hashlib
 import json
@@ -29,9 +29,6 @@ PYTHON_FILE_EXTENSIONS = (".py", ".pyi")
 # Combined C++ and Python file extensions for convenience
 CPP_AND_PYTHON_FILE_EXTENSIONS = (*CPP_FILE_EXTENSIONS, *PYTHON_FILE_EXTENSIONS)
 
-# YAML file extensions
-YAML_FILE_EXTENSIONS = (".yaml", ".yml")
-
 # Component path prefix
 ESPHOME_COMPONENTS_PATH = "esphome/components/"
 
@@ -301,6 +298,25 @@ def _get_changed_files_github_actions() -> list[str] | None:
 
 
 def changed_files(branch: str | None = None) -> list[str]:
+    """Get the files changed compared to the given branch.
+
+    Cached so scripts that check several conditions (like determine-jobs.py)
+    only run the git commands once per branch. Callers must not modify the
+    returned list.
+
+    Args:
+        branch: Branch to compare against. If None, uses dev.
+
+    Returns:
+        Sorted list of changed file paths
+    """
+    # Treat None and empty string the same so they share one cache entry
+    return _changed_files(branch or "dev")
+
+
+@cache
+def _changed_files(branch: str) -> list[str]:
+    """Get the files changed compared to branch, cached per branch."""
     # In GitHub Actions, we can use the API to get changed files more efficiently
     if os.environ.get("GITHUB_ACTIONS") == "true":
         github_files = _get_changed_files_github_actions()
@@ -308,8 +324,6 @@ def changed_files(branch: str | None = None) -> list[str]:
             return github_files
 
     # Original implementation for local development
-    if not branch:  # Treat None and empty string the same
-        branch = "dev"
     check_remotes = ["upstream", "origin"]
     check_remotes.extend(splitlines_no_ends(get_output("git", "remote")))
     for remote in check_remotes:
@@ -729,10 +743,7 @@ def filter_component_and_test_files(file_path: str) -> bool:
     Returns:
         True if the file is in a component or test directory
     """
-    return file_path.startswith(COMPONENT_AND_TESTS_PATHS) or (
-        file_path.startswith(ESPHOME_TESTS_COMPONENTS_PATH)
-        and file_path.endswith(YAML_FILE_EXTENSIONS)
-    )
+    return file_path.startswith(COMPONENT_AND_TESTS_PATHS)
 
 
 def filter_component_and_test_cpp_files(file_path: str) -> bool:
@@ -956,32 +967,43 @@ def create_components_graph() -> dict[str, list[str]]:
     return components_graph
 
 
+def _expand_dependents(
+    components_graph: dict[str, list[str]], component_names: Iterable[str]
+) -> set[str]:
+    """Find every component reachable from the given components in the graph.
+
+    Args:
+        components_graph: Graph mapping parent components to their children
+        component_names: Component names to start from
+
+    Returns:
+        Set of all dependent component names. A starting component is only
+        included when another starting component depends on it or a cycle
+        leads back to it.
+    """
+    dependents: set[str] = set()
+    pending = list(component_names)
+    while pending:
+        for child in components_graph.get(pending.pop(), ()):
+            if child not in dependents:
+                dependents.add(child)
+                pending.append(child)
+    return dependents
+
+
 def find_children_of_component(
-    components_graph: dict[str, list[str]], component_name: str, depth: int = 0
+    components_graph: dict[str, list[str]], component_name: str
 ) -> list[str]:
     """Find all components that depend on the given component (recursively).
 
     Args:
         components_graph: Graph mapping parent components to their children
         component_name: Component name to find children for
-        depth: Current recursion depth (max 10)
 
     Returns:
-        List of all dependent component names (may contain duplicates removed at end)
+        List of all dependent component names
     """
-    if component_name not in components_graph:
-        return []
-
-    children = []
-
-    for child in components_graph[component_name]:
-        children.append(child)
-        if depth < 10:
-            children.extend(
-                find_children_of_component(components_graph, child, depth + 1)
-            )
-    # Remove duplicate values
-    return list(set(children))
+    return list(_expand_dependents(components_graph, [component_name]))
 
 
 def get_components_with_dependencies(
@@ -998,16 +1020,13 @@ def get_components_with_dependencies(
     """
     components = extract_component_names_from_files(files)
 
-    if get_dependencies:
+    # Building the graph is expensive and there is nothing to expand when no
+    # component files changed
+    if get_dependencies and components:
         components_graph = create_components_graph()
-
-        all_components = components.copy()
-        for c in components:
-            all_components.extend(find_children_of_component(components_graph, c))
-        # Remove duplicate values
-        all_changed_components = list(set(all_components))
-
-        return sorted(all_changed_components)
+        return sorted(
+            set(components) | _expand_dependents(components_graph, components)
+        )
 
     return sorted(components)
 
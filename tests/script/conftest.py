@@ -0,0 +1,29 @@
+"""Shared fixtures for script tests."""
+
+import importlib.util
+from pathlib import Path
+import sys
+
+# Add the script directory to Python path so we can import the scripts
+SCRIPT_DIR = Path(__file__).resolve().parent.parent.parent / "script"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+
+def _load_determine_jobs() -> None:
+    """Load script/determine-jobs.py once per session as ``determine_jobs``.
+
+    The hyphen in the file name prevents a regular import, so the module is
+    loaded from its path and registered in ``sys.modules``; test modules can
+    then ``import determine_jobs`` and share the same module object.
+    """
+    if "determine_jobs" in sys.modules:
+        return
+    spec = importlib.util.spec_from_file_location(
+        "determine_jobs", SCRIPT_DIR / "determine-jobs.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["determine_jobs"] = module
+    spec.loader.exec_module(module)
+
+
+_load_determine_jobs()
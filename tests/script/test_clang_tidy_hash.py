@@ -165,6 +165,31 @@ def test_main_check_mode(
     assert exc_info.value.code == expected_exit
 
 
+@pytest.mark.parametrize(
+    ("stored_hash", "changed_files", "expected"),
+    [
+        ("abc123", [], False),  # Hash unchanged, hash file untouched
+        ("old456", [], True),  # Configuration hash changed
+        ("abc123", [".clang-tidy.hash"], True),  # Hash file updated in this PR
+    ],
+)
+def test_is_full_scan_needed(
+    tmp_path: Path, stored_hash: str, changed_files: list[str], expected: bool
+) -> None:
+    """Test is_full_scan_needed against the hash stored under repo_root."""
+    (tmp_path / ".clang-tidy.hash").write_text(f"{stored_hash}\n")
+
+    with (
+        patch(
+            "clang_tidy_hash.calculate_clang_tidy_hash", return_value="abc123"
+        ) as mock_calc,
+        patch("helpers.changed_files", return_value=changed_files),
+    ):
+        assert clang_tidy_hash.is_full_scan_needed(tmp_path) is expected
+
+    mock_calc.assert_called_once_with(tmp_path)
+
+
 def test_main_update_mode(capsys: pytest.CaptureFixture[str]) -> None:
     """Test main function in update mode."""
     current_hash = "abc123"
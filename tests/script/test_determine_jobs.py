@@ -1,394 +1,383 @@
 """Unit tests for script/determine-jobs.py module."""
 
 from collections.abc import Generator
-import importlib.util
 import json
-import os
 from pathlib import Path
-import sys
-from unittest.mock import Mock, call, patch
+from types import SimpleNamespace
+from unittest.mock import Mock, create_autospec, patch
 
+# determine_jobs and helpers are importable via tests/script/conftest.py
+import determine_jobs
+import helpers
 import pytest
 
-# Add the script directory to Python path so we can import the module
-script_dir = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "..", "script")
-)
-sys.path.insert(0, script_dir)
+import script.helpers
 
-# Import helpers module for patching
-import helpers  # noqa: E402
+# clang_tidy_mode values when clang-tidy runs
+CLANG_TIDY_ENABLED_MODES = frozenset({"nosplit", "split"})
 
-import script.helpers  # noqa: E402
+# Platforms the no-common-platform memory impact case may select
+NO_COMMON_PLATFORM_CANDIDATES = frozenset({"esp32-idf", "esp8266-ard"})
 
-spec = importlib.util.spec_from_file_location(
-    "determine_jobs", os.path.join(script_dir, "determine-jobs.py")
-)
-determine_jobs = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(determine_jobs)
+# 120 components with one test file each, for the batching tests
+BATCHING_COMPONENTS = [f"comp_{i:03d}" for i in range(120)]
 
 
 @pytest.fixture
-def mock_should_run_integration_tests() -> Generator[Mock, None, None]:
-    """Mock should_run_integration_tests from helpers."""
-    with patch.object(determine_jobs, "should_run_integration_tests") as mock:
+def mock_determine_cpp_unit_tests() -> Generator[Mock, None, None]:
+    """Mock determine_cpp_unit_tests from helpers."""
+    with patch.object(determine_jobs, "determine_cpp_unit_tests", spec=True) as mock:
         yield mock
 
 
-@pytest.fixture
-def mock_should_run_clang_tidy() -> Generator[Mock, None, None]:
-    """Mock should_run_clang_tidy from helpers."""
-    with patch.object(determine_jobs, "should_run_clang_tidy") as mock:
-        yield mock
+# main_mocks attribute -> determine_jobs function it replaces
+MAIN_MOCK_TARGETS = {
+    "integration_tests": "should_run_integration_tests",
+    "clang_tidy": "should_run_clang_tidy",
+    "clang_format": "should_run_clang_format",
+    "python_linters": "should_run_python_linters",
+    "clang_tidy_full_scan": "_is_clang_tidy_full_scan",
+    "memory_impact": "detect_memory_impact_config",
+    "changed_components": "get_changed_components",
+    "components_with_dependencies": "get_components_with_dependencies",
+}
 
 
-@pytest.fixture
-def mock_should_run_clang_format() -> Generator[Mock, None, None]:
-    """Mock should_run_clang_format from helpers."""
-    with patch.object(determine_jobs, "should_run_clang_format") as mock:
-        yield mock
+# Real functions captured at import, before any fixture can patch them
+_MAIN_MOCK_SPECS = {
+    target: getattr(determine_jobs, target) for target in MAIN_MOCK_TARGETS.values()
+}
+_CHANGED_FILES_SPEC = determine_jobs.changed_files
 
 
 @pytest.fixture
-def mock_should_run_python_linters() -> Generator[Mock, None, None]:
-    """Mock should_run_python_linters from helpers."""
-    with patch.object(determine_jobs, "should_run_python_linters") as mock:
-        yield mock
+def changed_files_mock(monkeypatch: pytest.MonkeyPatch) -> Mock:
+    """Mock changed_files; it returns no files until a test sets return_value."""
+    mock = create_autospec(_CHANGED_FILES_SPEC, return_value=[])
+    monkeypatch.setattr(determine_jobs, "changed_files", mock)
+    return mock
 
 
 @pytest.fixture
-def mock_determine_cpp_unit_tests() -> Generator[Mock, None, None]:
-    """Mock determine_cpp_unit_tests from helpers."""
-    with patch.object(determine_jobs, "determine_cpp_unit_tests") as mock:
-        yield mock
+def main_mocks(
+    changed_files_mock: Mock, monkeypatch: pytest.MonkeyPatch
+) -> SimpleNamespace:
+    """Mock the collaborators of compute_jobs().
+
+    By default no files or components changed, clang-tidy runs a targeted
+    scan and memory impact analysis is skipped. main_mocks.set_components()
+    sets the changed components.
+    """
+    mocks = SimpleNamespace(changed_files=changed_files_mock)
+    for name, target in MAIN_MOCK_TARGETS.items():
+        mock = create_autospec(_MAIN_MOCK_SPECS[target])
+        monkeypatch.setattr(determine_jobs, target, mock)
+        setattr(mocks, name, mock)
+    monkeypatch.setattr(
+        determine_jobs, "filter_component_and_test_files", _is_component_file
+    )
+    mocks.clang_tidy_full_scan.return_value = False
+    mocks.memory_impact.return_value = {"should_run": "false"}
+
+    def set_components(
+        changed_components: list[str] | None,
+        directly_changed: list[str],
+        with_dependencies: list[str] | None = None,
+    ) -> None:
+        """Set what get_changed_components() and get_components_with_dependencies() return."""
+        expanded = directly_changed if with_dependencies is None else with_dependencies
+        mocks.changed_components.return_value = changed_components
+        mocks.components_with_dependencies.side_effect = lambda files, deps: (
+            expanded if deps else directly_changed
+        )
 
+    mocks.set_components = set_components
+    set_components([], [])
+    return mocks
 
-@pytest.fixture
-def mock_changed_files() -> Generator[Mock, None, None]:
-    """Mock changed_files for memory impact detection."""
-    with patch.object(determine_jobs, "changed_files") as mock:
-        # Default to empty list
-        mock.return_value = []
-        yield mock
+
+def _is_component_file(file: str) -> bool:
+    """Stand-in for filter_component_and_test_files in main() tests."""
+    return file.startswith("esphome/components/")
 
 
 @pytest.fixture
 def mock_target_branch_dev() -> Generator[Mock, None, None]:
     """Mock get_target_branch to return 'dev' for memory impact tests."""
-    with patch.object(determine_jobs, "get_target_branch", return_value="dev") as mock:
+    with patch.object(
+        determine_jobs, "get_target_branch", spec=True, return_value="dev"
+    ) as mock:
         yield mock
 
 
-@pytest.fixture(autouse=True)
-def clear_determine_jobs_caches() -> None:
-    """Clear all cached functions before each test."""
-    determine_jobs._is_clang_tidy_full_scan.cache_clear()
-    determine_jobs._component_has_tests.cache_clear()
-
+@pytest.fixture
+def mock_component_test_files() -> Generator[dict[str, list[str]], None, None]:
+    """Mock the tests/components scan with an in-memory mapping.
 
-def test_main_all_tests_should_run(
-    mock_should_run_integration_tests: Mock,
-    mock_should_run_clang_tidy: Mock,
-    mock_should_run_clang_format: Mock,
-    mock_should_run_python_linters: Mock,
-    mock_changed_files: Mock,
-    mock_determine_cpp_unit_tests: Mock,
-    capsys: pytest.CaptureFixture[str],
-    monkeypatch: pytest.MonkeyPatch,
-) -> None:
-    """Test when all tests should run."""
-    # Ensure we're not in GITHUB_ACTIONS mode for this test
-    monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
+    Tests fill the returned dict with component name -> test file names
+    instead of creating a tests/components tree on disk.
+    """
+    test_files: dict[str, list[str]] = {}
 
-    mock_should_run_integration_tests.return_value = True
-    mock_should_run_clang_tidy.return_value = True
-    mock_should_run_clang_format.return_value = True
-    mock_should_run_python_linters.return_value = True
-    mock_determine_cpp_unit_tests.return_value = (False, ["wifi", "api", "sensor"])
-
-    # Mock changed_files to return non-component files (to avoid memory impact)
-    # Memory impact only runs when component C++ files change
-    mock_changed_files.return_value = [
-        "esphome/config.py",
-        "esphome/helpers.py",
-    ]
+    def _scan_component_test_platforms() -> dict[str, frozenset[str]]:
+        return {
+            component: frozenset(
+                helpers.parse_test_filename(Path(name))[1] for name in names
+            )
+            for component, names in test_files.items()
+            if names
+        }
 
-    # Run main function with mocked argv
-    with (
-        patch("sys.argv", ["determine-jobs.py"]),
-        patch.object(determine_jobs, "_is_clang_tidy_full_scan", return_value=False),
-        patch.object(
-            determine_jobs,
-            "get_changed_components",
-            return_value=["wifi", "api", "sensor"],
-        ),
-        patch.object(
-            determine_jobs,
-            "filter_component_and_test_files",
-            side_effect=lambda f: f.startswith("esphome/components/"),
-        ),
-        patch.object(
-            determine_jobs,
-            "get_components_with_dependencies",
-            side_effect=lambda files, deps: (
-                ["wifi", "api"] if not deps else ["wifi", "api", "sensor"]
-            ),
-        ),
-        patch.object(
-            determine_jobs,
-            "detect_memory_impact_config",
-            return_value={"should_run": "false"},
-        ),
-        patch.object(
-            determine_jobs,
-            "create_intelligent_batches",
-            return_value=([["wifi", "api", "sensor"]], {}),
-        ),
+    with patch.object(
+        determine_jobs,
+        "_scan_component_test_platforms",
+        side_effect=_scan_component_test_platforms,
     ):
-        determine_jobs.main()
+        yield test_files
 
-    # Check output
-    captured = capsys.readouterr()
-    output = json.loads(captured.out)
 
-    assert output["integration_tests"] is True
-    assert output["clang_tidy"] is True
-    assert output["clang_tidy_mode"] in ["nosplit", "split"]
-    assert output["clang_format"] is True
-    assert output["python_linters"] is True
-    assert output["changed_components"] == ["wifi", "api", "sensor"]
-    # changed_components_with_tests will only include components that actually have test files
-    assert "changed_components_with_tests" in output
-    assert isinstance(output["changed_components_with_tests"], list)
-    # component_test_count matches number of components with tests
-    assert output["component_test_count"] == len(
-        output["changed_components_with_tests"]
-    )
-    # changed_cpp_file_count should be present
-    assert "changed_cpp_file_count" in output
-    assert isinstance(output["changed_cpp_file_count"], int)
-    # memory_impact should be false (no component C++ files changed)
-    assert "memory_impact" in output
-    assert output["memory_impact"]["should_run"] == "false"
-    assert output["cpp_unit_tests_run_all"] is False
-    assert output["cpp_unit_tests_components"] == ["wifi", "api", "sensor"]
-    # component_test_batches should be present and be a list of space-separated strings
-    assert "component_test_batches" in output
-    assert isinstance(output["component_test_batches"], list)
-    # Each batch should be a space-separated string of component names
-    for batch in output["component_test_batches"]:
-        assert isinstance(batch, str)
-        # Should contain at least one component (no empty batches)
-        assert len(batch) > 0
+@pytest.fixture(scope="session")
+def components_tree(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Build a tests/components tree once per session and return its root.
 
+    Tests only look up the components they name, so they can share the
+    same tree.
+    """
+    root = tmp_path_factory.mktemp("components_tree")
+    tests_dir = root / "tests" / "components"
 
-def test_main_no_tests_should_run(
-    mock_should_run_integration_tests: Mock,
-    mock_should_run_clang_tidy: Mock,
-    mock_should_run_clang_format: Mock,
-    mock_should_run_python_linters: Mock,
-    mock_changed_files: Mock,
-    mock_determine_cpp_unit_tests: Mock,
-    capsys: pytest.CaptureFixture[str],
-    monkeypatch: pytest.MonkeyPatch,
-) -> None:
-    """Test when no tests should run."""
-    # Ensure we're not in GITHUB_ACTIONS mode for this test
-    monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
+    # improv_serial and ethernet have only variant tests (like the real components)
+    improv_serial_dir = tests_dir / "improv_serial"
+    improv_serial_dir.mkdir(parents=True)
+    (improv_serial_dir / "test-uart0.esp32-idf.yaml").write_text("test: config")
+    (improv_serial_dir / "test-uart0.esp8266-ard.yaml").write_text("test: config")
+    (improv_serial_dir / "test-usb_cdc.esp32-s2-idf.yaml").write_text("test: config")
 
-    mock_should_run_integration_tests.return_value = False
-    mock_should_run_clang_tidy.return_value = False
-    mock_should_run_clang_format.return_value = False
-    mock_should_run_python_linters.return_value = False
-    mock_determine_cpp_unit_tests.return_value = (False, [])
+    ethernet_dir = tests_dir / "ethernet"
+    ethernet_dir.mkdir(parents=True)
+    (ethernet_dir / "test-manual_ip.esp32-idf.yaml").write_text("test: config")
+    (ethernet_dir / "test-dhcp.esp32-idf.yaml").write_text("test: config")
 
-    # Mock changed_files to return no component files
-    mock_changed_files.return_value = []
-
-    # Run main function with mocked argv
-    with (
-        patch("sys.argv", ["determine-jobs.py"]),
-        patch.object(determine_jobs, "get_changed_components", return_value=[]),
-        patch.object(
-            determine_jobs, "filter_component_and_test_files", return_value=False
-        ),
-        patch.object(
-            determine_jobs, "get_components_with_dependencies", return_value=[]
-        ),
-        patch.object(
-            determine_jobs,
-            "detect_memory_impact_config",
-            return_value={"should_run": "false"},
-        ),
-        patch.object(
-            determine_jobs,
-            "create_intelligent_batches",
-            return_value=([], {}),
-        ),
-    ):
-        determine_jobs.main()
+    # no_tests component has no test files at all
+    (tests_dir / "no_tests").mkdir(parents=True)
 
-    # Check output
-    captured = capsys.readouterr()
-    output = json.loads(captured.out)
-
-    assert output["integration_tests"] is False
-    assert output["clang_tidy"] is False
-    assert output["clang_tidy_mode"] == "disabled"
-    assert output["clang_format"] is False
-    assert output["python_linters"] is False
-    assert output["changed_components"] == []
-    assert output["changed_components_with_tests"] == []
-    assert output["component_test_count"] == 0
-    # changed_cpp_file_count should be 0
-    assert output["changed_cpp_file_count"] == 0
-    # memory_impact should be present
-    assert "memory_impact" in output
-    assert output["memory_impact"]["should_run"] == "false"
-    assert output["cpp_unit_tests_run_all"] is False
-    assert output["cpp_unit_tests_components"] == []
-    # component_test_batches should be empty list
-    assert "component_test_batches" in output
-    assert output["component_test_batches"] == []
+    for comp in BATCHING_COMPONENTS:
+        comp_dir = tests_dir / comp
+        comp_dir.mkdir(parents=True)
+        (comp_dir / "test.esp32-idf.yaml").write_text(f"# Test for {comp}")
+
+    return root
 
 
-def test_main_with_branch_argument(
-    mock_should_run_integration_tests: Mock,
-    mock_should_run_clang_tidy: Mock,
-    mock_should_run_clang_format: Mock,
-    mock_should_run_python_linters: Mock,
-    mock_changed_files: Mock,
+@pytest.fixture
+def mock_is_full_scan_needed() -> Generator[Mock, None, None]:
+    """Mock the clang-tidy hash check."""
+    with patch.object(determine_jobs, "is_full_scan_needed", spec=True) as mock:
+        yield mock
+
+
+def _clear_determine_jobs_caches() -> None:
+    """Clear all cached functions in determine_jobs."""
+    determine_jobs._is_clang_tidy_full_scan.cache_clear()
+    determine_jobs._scan_component_test_platforms.cache_clear()
+    helpers._changed_files.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_determine_jobs_caches() -> Generator[None, None, None]:
+    """Clear all cached functions before and after each test."""
+    _clear_determine_jobs_caches()
+    yield
+    _clear_determine_jobs_caches()
+
+
+@pytest.mark.parametrize(
+    "case",
+    [
+        # Changed files are non-component files to avoid memory impact;
+        # memory impact only runs when component C++ files change
+        pytest.param(
+            SimpleNamespace(
+                argv=[],
+                should_run={
+                    "integration_tests": True,
+                    "clang_tidy": True,
+                    "clang_format": True,
+                    "python_linters": True,
+                },
+                changed_files=["esphome/config.py", "esphome/helpers.py"],
+                directly_changed=["wifi", "api"],
+                with_dependencies=["wifi", "api", "sensor"],
+                cpp_unit_tests=(False, ["wifi", "api", "sensor"]),
+                expected={
+                    "integration_tests": True,
+                    "clang_tidy": True,
+                    "clang_format": True,
+                    "python_linters": True,
+                    "changed_components": ["wifi", "api", "sensor"],
+                    "memory_impact": {"should_run": "false"},
+                    "cpp_unit_tests_run_all": False,
+                    "cpp_unit_tests_components": ["wifi", "api", "sensor"],
+                },
+            ),
+            id="all_run",
+        ),
+        pytest.param(
+            SimpleNamespace(
+                argv=[],
+                should_run={
+                    "integration_tests": False,
+                    "clang_tidy": False,
+                    "clang_format": False,
+                    "python_linters": False,
+                },
+                changed_files=[],
+                directly_changed=[],
+                with_dependencies=[],
+                cpp_unit_tests=(False, []),
+                expected={
+                    "integration_tests": False,
+                    "clang_tidy": False,
+                    "clang_tidy_mode": "disabled",
+                    "clang_format": False,
+                    "python_linters": False,
+                    "changed_components": [],
+                    "changed_components_with_tests": [],
+                    "component_test_count": 0,
+                    "changed_cpp_file_count": 0,
+                    "memory_impact": {"should_run": "false"},
+                    "cpp_unit_tests_run_all": False,
+                    "cpp_unit_tests_components": [],
+                    "component_test_batches": [],
+                },
+            ),
+            id="none_run",
+        ),
+        pytest.param(
+            SimpleNamespace(
+                argv=["-b", "main"],
+                should_run={
+                    "integration_tests": False,
+                    "clang_tidy": True,
+                    "clang_format": False,
+                    "python_linters": True,
+                },
+                changed_files=["esphome/config.py"],
+                directly_changed=["mqtt"],
+                with_dependencies=["mqtt"],
+                cpp_unit_tests=(False, ["mqtt"]),
+                expected={
+                    "integration_tests": False,
+                    "clang_tidy": True,
+                    "clang_format": False,
+                    "python_linters": True,
+                    "changed_components": ["mqtt"],
+                    "memory_impact": {"should_run": "false"},
+                    "cpp_unit_tests_run_all": False,
+                    "cpp_unit_tests_components": ["mqtt"],
+                },
+            ),
+            id="with_branch",
+        ),
+    ],
+)
+def test_main(
+    case: SimpleNamespace,
+    main_mocks: SimpleNamespace,
     mock_determine_cpp_unit_tests: Mock,
-    capsys: pytest.CaptureFixture[str],
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    """Test with branch argument."""
+    """Test main() output for the should_run_* checks and changed components."""
     # Ensure we're not in GITHUB_ACTIONS mode for this test
     monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
 
-    mock_should_run_integration_tests.return_value = False
-    mock_should_run_clang_tidy.return_value = True
-    mock_should_run_clang_format.return_value = False
-    mock_should_run_python_linters.return_value = True
-    mock_determine_cpp_unit_tests.return_value = (False, ["mqtt"])
-
-    # Mock changed_files to return non-component files (to avoid memory impact)
-    # Memory impact only runs when component C++ files change
-    mock_changed_files.return_value = ["esphome/config.py"]
-
-    with (
-        patch("sys.argv", ["script.py", "-b", "main"]),
-        patch.object(determine_jobs, "_is_clang_tidy_full_scan", return_value=False),
-        patch.object(determine_jobs, "get_changed_components", return_value=["mqtt"]),
-        patch.object(
-            determine_jobs,
-            "filter_component_and_test_files",
-            side_effect=lambda f: f.startswith("esphome/components/"),
-        ),
-        patch.object(
-            determine_jobs, "get_components_with_dependencies", return_value=["mqtt"]
-        ),
-        patch.object(
-            determine_jobs,
-            "detect_memory_impact_config",
-            return_value={"should_run": "false"},
-        ),
-        patch.object(
-            determine_jobs,
-            "create_intelligent_batches",
-            return_value=([["mqtt"]], {}),
-        ),
-    ):
-        determine_jobs.main()
+    for name, result in case.should_run.items():
+        getattr(main_mocks, name).return_value = result
+    mock_determine_cpp_unit_tests.return_value = case.cpp_unit_tests
+    main_mocks.changed_files.return_value = case.changed_files
+    with_dependencies = case.with_dependencies
+    main_mocks.set_components(
+        with_dependencies, case.directly_changed, with_dependencies
+    )
+    monkeypatch.setattr(
+        determine_jobs,
+        "create_intelligent_batches",
+        lambda **kwargs: ([with_dependencies] if with_dependencies else [], {}),
+    )
 
-    # Check that functions were called with branch
-    mock_should_run_integration_tests.assert_called_once_with("main")
-    mock_should_run_clang_tidy.assert_called_once_with("main")
-    mock_should_run_clang_format.assert_called_once_with("main")
-    mock_should_run_python_linters.assert_called_once_with("main")
+    output = determine_jobs.compute_jobs(case.argv)
 
-    # Check output
-    captured = capsys.readouterr()
-    output = json.loads(captured.out)
+    # Check that functions were called with the branch from argv (if any)
+    branch = case.argv[1] if case.argv else None
+    main_mocks.integration_tests.assert_called_once_with(branch)
+    main_mocks.clang_tidy.assert_called_once_with(branch)
+    main_mocks.clang_format.assert_called_once_with(branch)
+    main_mocks.python_linters.assert_called_once_with(branch)
 
-    assert output["integration_tests"] is False
-    assert output["clang_tidy"] is True
-    assert output["clang_tidy_mode"] in ["nosplit", "split"]
-    assert output["clang_format"] is False
-    assert output["python_linters"] is True
-    assert output["changed_components"] == ["mqtt"]
+    assert output.items() >= case.expected.items()
+    # The split/nosplit choice depends on the C++ files tracked in the repo
+    if "clang_tidy_mode" not in case.expected:
+        assert output["clang_tidy_mode"] in CLANG_TIDY_ENABLED_MODES
     # changed_components_with_tests will only include components that actually have test files
-    assert "changed_components_with_tests" in output
     assert isinstance(output["changed_components_with_tests"], list)
     # component_test_count matches number of components with tests
     assert output["component_test_count"] == len(
         output["changed_components_with_tests"]
     )
-    # changed_cpp_file_count should be present
-    assert "changed_cpp_file_count" in output
     assert isinstance(output["changed_cpp_file_count"], int)
-    # memory_impact should be false (no component C++ files changed)
-    assert "memory_impact" in output
-    assert output["memory_impact"]["should_run"] == "false"
-    assert output["cpp_unit_tests_run_all"] is False
-    assert output["cpp_unit_tests_components"] == ["mqtt"]
+    # component_test_batches should be a list of non-empty space-separated strings
+    assert isinstance(output["component_test_batches"], list)
+    for batch in output["component_test_batches"]:
+        assert isinstance(batch, str)
+        assert len(batch) > 0
 
 
-def test_should_run_integration_tests(
-    monkeypatch: pytest.MonkeyPatch,
-) -> None:
-    """Test should_run_integration_tests function."""
-    # Core C++ files trigger tests
-    with patch.object(
-        determine_jobs, "changed_files", return_value=["esphome/core/component.cpp"]
-    ):
-        result = determine_jobs.should_run_integration_tests()
-        assert result is True
+def test_main_prints_jobs_as_json(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that main() prints the computed jobs as JSON."""
+    jobs = {"integration_tests": True, "changed_components": ["wifi"]}
+    with patch.object(determine_jobs, "compute_jobs", return_value=jobs):
+        determine_jobs.main()
 
-    # Core Python files trigger tests
-    with patch.object(
-        determine_jobs, "changed_files", return_value=["esphome/core/config.py"]
-    ):
-        result = determine_jobs.should_run_integration_tests()
-        assert result is True
+    assert json.loads(capsys.readouterr().out) == jobs
 
-    # Python files directly in esphome/ do NOT trigger tests
-    with patch.object(
-        determine_jobs, "changed_files", return_value=["esphome/config.py"]
-    ):
-        result = determine_jobs.should_run_integration_tests()
-        assert result is False
 
-    # Python files in subdirectories (not core) do NOT trigger tests
-    with patch.object(
-        determine_jobs,
-        "changed_files",
-        return_value=["esphome/dashboard/web_server.py"],
-    ):
-        result = determine_jobs.should_run_integration_tests()
-        assert result is False
+@pytest.mark.parametrize(
+    ("changed_files", "expected_result"),
+    [
+        # Core C++ files trigger tests
+        (["esphome/core/component.cpp"], True),
+        # Core Python files trigger tests
+        (["esphome/core/config.py"], True),
+        # Python files directly in esphome/ do NOT trigger tests
+        (["esphome/config.py"], False),
+        # Python files in subdirectories (not core) do NOT trigger tests
+        (["esphome/dashboard/web_server.py"], False),
+    ],
+)
+def test_should_run_integration_tests(
+    changed_files: list[str],
+    expected_result: bool,
+    changed_files_mock: Mock,
+) -> None:
+    """Test should_run_integration_tests function."""
+    changed_files_mock.return_value = changed_files
+    assert determine_jobs.should_run_integration_tests() is expected_result
 
 
-def test_should_run_integration_tests_with_branch() -> None:
+def test_should_run_integration_tests_with_branch(changed_files_mock: Mock) -> None:
     """Test should_run_integration_tests with branch argument."""
-    with patch.object(determine_jobs, "changed_files") as mock_changed:
-        mock_changed.return_value = []
-        determine_jobs.should_run_integration_tests("release")
-        mock_changed.assert_called_once_with("release")
+    determine_jobs.should_run_integration_tests("release")
+    changed_files_mock.assert_called_once_with("release")
 
 
-def test_should_run_integration_tests_component_dependency() -> None:
+def test_should_run_integration_tests_component_dependency(
+    changed_files_mock: Mock,
+) -> None:
     """Test that integration tests run when components used in fixtures change."""
-    with (
-        patch.object(
-            determine_jobs,
-            "changed_files",
-            return_value=["esphome/components/api/api.cpp"],
-        ),
-        patch.object(
-            determine_jobs, "get_components_from_integration_fixtures"
-        ) as mock_fixtures,
-    ):
+    changed_files_mock.return_value = ["esphome/components/api/api.cpp"]
+    with patch.object(
+        determine_jobs, "get_components_from_integration_fixtures"
+    ) as mock_fixtures:
         mock_fixtures.return_value = {"api", "sensor"}
         with patch.object(determine_jobs, "get_all_dependencies") as mock_deps:
             mock_deps.return_value = {"api", "sensor", "network"}
@@ -397,52 +386,48 @@ def test_should_run_integration_tests_component_dependency() -> None:
 
 
 @pytest.mark.parametrize(
-    ("check_returncode", "changed_files", "expected_result"),
+    ("full_scan", "changed_files", "expected_result"),
     [
-        (0, [], True),  # Hash changed - need full scan
-        (1, ["esphome/core.cpp"], True),  # C++ file changed
-        (1, ["README.md"], False),  # No C++ files changed
-        (1, [".clang-tidy.hash"], True),  # Hash file itself changed
-        (1, ["platformio.ini", ".clang-tidy.hash"], True),  # Config + hash changed
+        (True, [], True),  # Hash changed - need full scan
+        (False, ["esphome/core.cpp"], True),  # C++ file changed
+        (False, ["README.md"], False),  # No C++ files changed
+        (False, [".clang-tidy.hash"], True),  # Hash file itself changed
+        (False, ["platformio.ini", ".clang-tidy.hash"], True),  # Config + hash changed
     ],
 )
 def test_should_run_clang_tidy(
-    check_returncode: int,
+    full_scan: bool,
     changed_files: list[str],
     expected_result: bool,
+    changed_files_mock: Mock,
+    mock_is_full_scan_needed: Mock,
 ) -> None:
     """Test should_run_clang_tidy function."""
-    with (
-        patch.object(determine_jobs, "changed_files", return_value=changed_files),
-        patch("subprocess.run") as mock_run,
-    ):
-        # Test with hash check returning specific code
-        mock_run.return_value = Mock(returncode=check_returncode)
-        result = determine_jobs.should_run_clang_tidy()
-        assert result == expected_result
+    changed_files_mock.return_value = changed_files
+    mock_is_full_scan_needed.return_value = full_scan
+    assert determine_jobs.should_run_clang_tidy() == expected_result
 
 
-def test_should_run_clang_tidy_hash_check_exception() -> None:
+def test_should_run_clang_tidy_hash_check_exception(
+    changed_files_mock: Mock,
+    mock_is_full_scan_needed: Mock,
+) -> None:
     """Test should_run_clang_tidy when hash check fails with exception."""
     # When hash check fails, clang-tidy should run as a safety measure
-    with (
-        patch.object(determine_jobs, "changed_files", return_value=["README.md"]),
-        patch("subprocess.run", side_effect=Exception("Hash check failed")),
-    ):
-        result = determine_jobs.should_run_clang_tidy()
-        assert result is True  # Fail safe - run clang-tidy
+    changed_files_mock.return_value = ["README.md"]
+    mock_is_full_scan_needed.side_effect = Exception("Hash check failed")
+    assert determine_jobs.should_run_clang_tidy() is True  # Fail safe - run clang-tidy
 
 
-def test_should_run_clang_tidy_with_branch() -> None:
+def test_should_run_clang_tidy_with_branch(
+    changed_files_mock: Mock, mock_is_full_scan_needed: Mock
+) -> None:
     """Test should_run_clang_tidy with branch argument."""
-    with patch.object(determine_jobs, "changed_files") as mock_changed:
-        mock_changed.return_value = []
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = Mock(returncode=1)  # Hash unchanged
-            determine_jobs.should_run_clang_tidy("release")
-            # Changed files is called twice now - once for hash check, once for .clang-tidy.hash check
-            assert mock_changed.call_count == 2
-            mock_changed.assert_has_calls([call("release"), call("release")])
+    mock_is_full_scan_needed.return_value = False  # Hash unchanged
+    determine_jobs.should_run_clang_tidy("release")
+    # The changed file list is fetched once and reused for both the
+    # .clang-tidy.hash check and the C++ extension check
+    changed_files_mock.assert_called_once_with("release")
 
 
 @pytest.mark.parametrize(
@@ -456,20 +441,19 @@ def test_should_run_clang_tidy_with_branch() -> None:
     ],
 )
 def test_should_run_python_linters(
-    changed_files: list[str], expected_result: bool
+    changed_files: list[str],
+    expected_result: bool,
+    changed_files_mock: Mock,
 ) -> None:
     """Test should_run_python_linters function."""
-    with patch.object(determine_jobs, "changed_files", return_value=changed_files):
-        result = determine_jobs.should_run_python_linters()
-        assert result == expected_result
+    changed_files_mock.return_value = changed_files
+    assert determine_jobs.should_run_python_linters() == expected_result
 
 
-def test_should_run_python_linters_with_branch() -> None:
+def test_should_run_python_linters_with_branch(changed_files_mock: Mock) -> None:
     """Test should_run_python_linters with branch argument."""
-    with patch.object(determine_jobs, "changed_files") as mock_changed:
-        mock_changed.return_value = []
-        determine_jobs.should_run_python_linters("release")
-        mock_changed.assert_called_once_with("release")
+    determine_jobs.should_run_python_linters("release")
+    changed_files_mock.assert_called_once_with("release")
 
 
 @pytest.mark.parametrize(
@@ -487,20 +471,19 @@ def test_should_run_python_linters_with_branch() -> None:
     ],
 )
 def test_should_run_clang_format(
-    changed_files: list[str], expected_result: bool
+    changed_files: list[str],
+    expected_result: bool,
+    changed_files_mock: Mock,
 ) -> None:
     """Test should_run_clang_format function."""
-    with patch.object(determine_jobs, "changed_files", return_value=changed_files):
-        result = determine_jobs.should_run_clang_format()
-        assert result == expected_result
+    changed_files_mock.return_value = changed_files
+    assert determine_jobs.should_run_clang_format() == expected_result
 
 
-def test_should_run_clang_format_with_branch() -> None:
+def test_should_run_clang_format_with_branch(changed_files_mock: Mock) -> None:
     """Test should_run_clang_format with branch argument."""
-    with patch.object(determine_jobs, "changed_files") as mock_changed:
-        mock_changed.return_value = []
-        determine_jobs.should_run_clang_format("release")
-        mock_changed.assert_called_once_with("release")
+    determine_jobs.should_run_clang_format("release")
+    changed_files_mock.assert_called_once_with("release")
 
 
 @pytest.mark.parametrize(
@@ -522,99 +505,58 @@ def test_should_run_clang_format_with_branch() -> None:
         ([], 0),
     ],
 )
-def test_count_changed_cpp_files(changed_files: list[str], expected_count: int) -> None:
+def test_count_changed_cpp_files(
+    changed_files: list[str],
+    expected_count: int,
+    changed_files_mock: Mock,
+) -> None:
     """Test count_changed_cpp_files function."""
-    with patch.object(determine_jobs, "changed_files", return_value=changed_files):
-        result = determine_jobs.count_changed_cpp_files()
-        assert result == expected_count
+    changed_files_mock.return_value = changed_files
+    assert determine_jobs.count_changed_cpp_files() == expected_count
 
 
-def test_count_changed_cpp_files_with_branch() -> None:
+def test_count_changed_cpp_files_with_branch(changed_files_mock: Mock) -> None:
     """Test count_changed_cpp_files with branch argument."""
-    with patch.object(determine_jobs, "changed_files") as mock_changed:
-        mock_changed.return_value = []
-        determine_jobs.count_changed_cpp_files("release")
-        mock_changed.assert_called_once_with("release")
+    determine_jobs.count_changed_cpp_files("release")
+    changed_files_mock.assert_called_once_with("release")
 
 
 def test_main_filters_components_without_tests(
-    mock_should_run_integration_tests: Mock,
-    mock_should_run_clang_tidy: Mock,
-    mock_should_run_clang_format: Mock,
-    mock_should_run_python_linters: Mock,
-    mock_changed_files: Mock,
-    capsys: pytest.CaptureFixture[str],
-    tmp_path: Path,
+    main_mocks: SimpleNamespace,
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     """Test that components without test files are filtered out."""
     # Ensure we're not in GITHUB_ACTIONS mode for this test
     monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
 
-    mock_should_run_integration_tests.return_value = False
-    mock_should_run_clang_tidy.return_value = False
-    mock_should_run_clang_format.return_value = False
-    mock_should_run_python_linters.return_value = False
+    main_mocks.integration_tests.return_value = False
+    main_mocks.clang_tidy.return_value = False
+    main_mocks.clang_format.return_value = False
+    main_mocks.python_linters.return_value = False
 
     # Mock changed_files to return component files
-    mock_changed_files.return_value = [
+    main_mocks.changed_files.return_value = [
         "esphome/components/wifi/wifi.cpp",
         "esphome/components/sensor/sensor.h",
     ]
 
-    # Create test directory structure
-    tests_dir = tmp_path / "tests" / "components"
+    # wifi and sensor have test files, airthings_ble has none
+    monkeypatch.setattr(
+        determine_jobs, "_component_has_tests", {"wifi", "sensor"}.__contains__
+    )
 
-    # wifi has tests
-    wifi_dir = tests_dir / "wifi"
-    wifi_dir.mkdir(parents=True)
-    (wifi_dir / "test.esp32.yaml").write_text("test: config")
-
-    # sensor has tests
-    sensor_dir = tests_dir / "sensor"
-    sensor_dir.mkdir(parents=True)
-    (sensor_dir / "test.esp8266.yaml").write_text("test: config")
-
-    # airthings_ble exists but has no test files
-    airthings_dir = tests_dir / "airthings_ble"
-    airthings_dir.mkdir(parents=True)
-
-    # Mock root_path to use tmp_path (need to patch both determine_jobs and helpers)
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(helpers, "create_components_graph", return_value={}),
-        patch("sys.argv", ["determine-jobs.py"]),
-        patch.object(
-            determine_jobs,
-            "get_changed_components",
-            return_value=["wifi", "sensor", "airthings_ble"],
-        ),
-        patch.object(
-            determine_jobs,
-            "filter_component_and_test_files",
-            side_effect=lambda f: f.startswith("esphome/components/"),
-        ),
-        patch.object(
-            determine_jobs,
-            "get_components_with_dependencies",
-            side_effect=lambda files, deps: (
-                ["wifi", "sensor"] if not deps else ["wifi", "sensor", "airthings_ble"]
-            ),
-        ),
-        patch.object(determine_jobs, "changed_files", return_value=[]),
-        patch.object(
-            determine_jobs,
-            "detect_memory_impact_config",
-            return_value={"should_run": "false"},
-        ),
-    ):
-        # Clear the cache since we're mocking root_path
-        determine_jobs.main()
+    main_mocks.set_components(
+        ["wifi", "sensor", "airthings_ble"],
+        ["wifi", "sensor"],
+        ["wifi", "sensor", "airthings_ble"],
+    )
+    monkeypatch.setattr(
+        determine_jobs,
+        "create_intelligent_batches",
+        lambda **kwargs: ([["wifi", "sensor"]], {}),
+    )
 
-    # Check output
-    captured = capsys.readouterr()
-    output = json.loads(captured.out)
+    output = determine_jobs.compute_jobs([])
 
     # changed_components should have all components
     assert set(output["changed_components"]) == {"wifi", "sensor", "airthings_ble"}
@@ -631,13 +573,8 @@ def test_main_filters_components_without_tests(
 
 
 def test_main_detects_components_with_variant_tests(
-    mock_should_run_integration_tests: Mock,
-    mock_should_run_clang_tidy: Mock,
-    mock_should_run_clang_format: Mock,
-    mock_should_run_python_linters: Mock,
-    mock_changed_files: Mock,
-    capsys: pytest.CaptureFixture[str],
-    tmp_path: Path,
+    main_mocks: SimpleNamespace,
+    components_tree: Path,
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     """Test that components with only variant test files (test-*.yaml) are detected.
@@ -649,76 +586,29 @@ def test_main_detects_components_with_variant_tests(
     # Ensure we're not in GITHUB_ACTIONS mode for this test
     monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
 
-    mock_should_run_integration_tests.return_value = False
-    mock_should_run_clang_tidy.return_value = False
-    mock_should_run_clang_format.return_value = False
-    mock_should_run_python_linters.return_value = False
+    main_mocks.integration_tests.return_value = False
+    main_mocks.clang_tidy.return_value = False
+    main_mocks.clang_format.return_value = False
+    main_mocks.python_linters.return_value = False
 
     # Mock changed_files to return component files
-    mock_changed_files.return_value = [
+    main_mocks.changed_files.return_value = [
         "esphome/components/improv_serial/improv_serial.cpp",
         "esphome/components/ethernet/ethernet.cpp",
         "esphome/components/no_tests/component.cpp",
     ]
 
-    # Create test directory structure
-    tests_dir = tmp_path / "tests" / "components"
-
-    # improv_serial has only variant tests (like the real component)
-    improv_serial_dir = tests_dir / "improv_serial"
-    improv_serial_dir.mkdir(parents=True)
-    (improv_serial_dir / "test-uart0.esp32-idf.yaml").write_text("test: config")
-    (improv_serial_dir / "test-uart0.esp8266-ard.yaml").write_text("test: config")
-    (improv_serial_dir / "test-usb_cdc.esp32-s2-idf.yaml").write_text("test: config")
-
-    # ethernet also has only variant tests
-    ethernet_dir = tests_dir / "ethernet"
-    ethernet_dir.mkdir(parents=True)
-    (ethernet_dir / "test-manual_ip.esp32-idf.yaml").write_text("test: config")
-    (ethernet_dir / "test-dhcp.esp32-idf.yaml").write_text("test: config")
-
-    # no_tests component has no test files at all
-    no_tests_dir = tests_dir / "no_tests"
-    no_tests_dir.mkdir(parents=True)
-
-    # Mock root_path to use tmp_path (need to patch both determine_jobs and helpers)
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(helpers, "create_components_graph", return_value={}),
-        patch("sys.argv", ["determine-jobs.py"]),
-        patch.object(
-            determine_jobs,
-            "get_changed_components",
-            return_value=["improv_serial", "ethernet", "no_tests"],
-        ),
-        patch.object(
-            determine_jobs,
-            "filter_component_and_test_files",
-            side_effect=lambda f: f.startswith("esphome/components/"),
-        ),
-        patch.object(
-            determine_jobs,
-            "get_components_with_dependencies",
-            side_effect=lambda files, deps: (
-                ["improv_serial", "ethernet"]
-                if not deps
-                else ["improv_serial", "ethernet", "no_tests"]
-            ),
-        ),
-        patch.object(determine_jobs, "changed_files", return_value=[]),
-        patch.object(
-            determine_jobs,
-            "detect_memory_impact_config",
-            return_value={"should_run": "false"},
-        ),
-    ):
-        # Clear the cache since we're mocking root_path
-        determine_jobs.main()
+    # Point root_path at the shared tree (need to patch both determine_jobs and helpers)
+    monkeypatch.setattr(determine_jobs, "root_path", str(components_tree))
+    monkeypatch.setattr(helpers, "root_path", str(components_tree))
+    monkeypatch.setattr(helpers, "create_components_graph", lambda: {})
+    main_mocks.set_components(
+        ["improv_serial", "ethernet", "no_tests"],
+        ["improv_serial", "ethernet"],
+        ["improv_serial", "ethernet", "no_tests"],
+    )
 
-    # Check output
-    captured = capsys.readouterr()
-    output = json.loads(captured.out)
+    output = determine_jobs.compute_jobs([])
 
     # changed_components should have all components
     assert set(output["changed_components"]) == {
@@ -734,264 +624,206 @@ def test_main_detects_components_with_variant_tests(
     assert "no_tests" not in output["changed_components_with_tests"]
 
 
-# Tests for detect_memory_impact_config function
-
-
-@pytest.mark.usefixtures("mock_target_branch_dev")
-def test_detect_memory_impact_config_with_common_platform(tmp_path: Path) -> None:
-    """Test memory impact detection when components share a common platform."""
-    # Create test directory structure
+def test_scan_component_test_platforms(tmp_path: Path) -> None:
+    """Test that the tests/components scan collects platforms per component."""
     tests_dir = tmp_path / "tests" / "components"
 
-    # wifi component with esp32-idf test
     wifi_dir = tests_dir / "wifi"
     wifi_dir.mkdir(parents=True)
     (wifi_dir / "test.esp32-idf.yaml").write_text("test: wifi")
+    (wifi_dir / "test.esp8266-ard.yaml").write_text("test: wifi")
+    (wifi_dir / "common.yaml").write_text("common: wifi")
 
-    # api component with esp32-idf test
-    api_dir = tests_dir / "api"
-    api_dir.mkdir(parents=True)
-    (api_dir / "test.esp32-idf.yaml").write_text("test: api")
-
-    # Mock changed_files to return wifi and api component changes
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-    ):
-        mock_changed_files.return_value = [
-            "esphome/components/wifi/wifi.cpp",
-            "esphome/components/api/api.cpp",
-        ]
-
-        result = determine_jobs.detect_memory_impact_config()
-
-    assert result["should_run"] == "true"
-    assert set(result["components"]) == {"wifi", "api"}
-    assert result["platform"] == "esp32-idf"  # Common platform
-    assert result["use_merged_config"] == "true"
-
+    # Variant test files count as tests too
+    ethernet_dir = tests_dir / "ethernet"
+    ethernet_dir.mkdir(parents=True)
+    (ethernet_dir / "test-dhcp.esp32-c3-idf.yaml").write_text("test: ethernet")
 
-@pytest.mark.usefixtures("mock_target_branch_dev")
-def test_detect_memory_impact_config_core_only_changes(tmp_path: Path) -> None:
-    """Test memory impact detection with core C++ changes (no component changes)."""
-    # Create test directory structure with fallback component
-    tests_dir = tmp_path / "tests" / "components"
+    # Directories without test files are skipped
+    (tests_dir / "no_tests").mkdir(parents=True)
+    (tests_dir / "no_tests" / "common.yaml").write_text("common: no_tests")
+    (tests_dir / "README.md").write_text("readme")
 
-    # api component (fallback component) with esp32-idf test
-    api_dir = tests_dir / "api"
-    api_dir.mkdir(parents=True)
-    (api_dir / "test.esp32-idf.yaml").write_text("test: api")
+    with patch.object(determine_jobs, "root_path", str(tmp_path)):
+        result = determine_jobs._scan_component_test_platforms()
 
-    # Mock changed_files to return only core C++ files (no component files)
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-    ):
-        mock_changed_files.return_value = [
-            "esphome/core/application.cpp",
-            "esphome/core/component.h",
-        ]
+    assert result == {
+        "wifi": frozenset({"esp32-idf", "esp8266-ard"}),
+        "ethernet": frozenset({"esp32-c3-idf"}),
+    }
 
-        result = determine_jobs.detect_memory_impact_config()
 
-    assert result["should_run"] == "true"
-    assert result["components"] == ["api"]  # Fallback component
-    assert result["platform"] == "esp32-idf"  # Fallback platform
-    assert result["use_merged_config"] == "true"
+def test_scan_component_test_platforms_missing_dir(tmp_path: Path) -> None:
+    """Test that a missing tests/components directory yields no components."""
+    with patch.object(determine_jobs, "root_path", str(tmp_path)):
+        assert determine_jobs._scan_component_test_platforms() == {}
 
 
-def test_detect_memory_impact_config_core_python_only_changes(tmp_path: Path) -> None:
-    """Test that Python-only core changes don't trigger memory impact analysis."""
-    # Create test directory structure with fallback component
-    tests_dir = tmp_path / "tests" / "components"
+# Tests for detect_memory_impact_config function
 
-    # api component (fallback component) with esp32-idf test
-    api_dir = tests_dir / "api"
-    api_dir.mkdir(parents=True)
-    (api_dir / "test.esp32-idf.yaml").write_text("test: api")
 
-    # Mock changed_files to return only core Python files (no C++ files)
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-    ):
-        mock_changed_files.return_value = [
-            "esphome/__main__.py",
-            "esphome/config.py",
-            "esphome/core/config.py",
-        ]
+@pytest.mark.parametrize(
+    ("test_files", "changed", "target_branch", "expected"),
+    [
+        pytest.param(
+            {"wifi": ["test.esp32-idf.yaml"], "api": ["test.esp32-idf.yaml"]},
+            ["esphome/components/wifi/wifi.cpp", "esphome/components/api/api.cpp"],
+            "dev",
+            {
+                "should_run": "true",
+                "components": ["api", "wifi"],
+                "platform": "esp32-idf",
+                "use_merged_config": "true",
+            },
+            id="common_platform",
+        ),
+        # Core C++ changes without component changes use the fallback
+        # component (api) on the fallback platform
+        pytest.param(
+            {"api": ["test.esp32-idf.yaml"]},
+            ["esphome/core/application.cpp", "esphome/core/component.h"],
+            "dev",
+            {
+                "should_run": "true",
+                "components": ["api"],
+                "platform": "esp32-idf",
+                "use_merged_config": "true",
+            },
+            id="core_only_changes",
+        ),
+        # Python-only core changes don't affect memory usage
+        pytest.param(
+            {"api": ["test.esp32-idf.yaml"]},
+            ["esphome/__main__.py", "esphome/config.py", "esphome/core/config.py"],
+            "dev",
+            {"should_run": "false"},
+            id="core_python_only_changes",
+        ),
+        pytest.param({}, [], "dev", {"should_run": "false"}, id="no_changes"),
+        pytest.param(
+            {"my_custom_component": []},
+            ["esphome/components/my_custom_component/component.cpp"],
+            "dev",
+            {"should_run": "false"},
+            id="no_components_with_tests",
+        ),
+        # Base bus components (i2c, spi, uart) are analyzed when directly changed,
+        # even though they are often used as dependencies, so optimizations to
+        # them are properly measured
+        pytest.param(
+            {"uart": ["test.esp32-idf.yaml"], "wifi": ["test.esp32-idf.yaml"]},
+            [
+                "esphome/components/uart/automation.h",  # Header file with inline code
+                "esphome/components/wifi/wifi.cpp",
+            ],
+            "dev",
+            {
+                "should_run": "true",
+                "components": ["uart", "wifi"],
+                "platform": "esp32-idf",
+                "use_merged_config": "true",
+            },
+            id="includes_base_bus_components",
+        ),
+        # Components like improv_serial and ethernet only have variant test
+        # files (test-*.yaml) instead of base test files (test.*.yaml)
+        pytest.param(
+            {
+                "improv_serial": [
+                    "test-uart0.esp32-idf.yaml",
+                    "test-uart0.esp8266-ard.yaml",
+                    "test-usb_cdc.esp32-s2-idf.yaml",
+                ],
+                "ethernet": [
+                    "test-manual_ip.esp32-idf.yaml",
+                    "test-dhcp.esp32-c3-idf.yaml",
+                ],
+            },
+            [
+                "esphome/components/improv_serial/improv_serial.cpp",
+                "esphome/components/ethernet/ethernet.cpp",
+            ],
+            "dev",
+            {
+                "should_run": "true",
+                "components": ["ethernet", "improv_serial"],
+                "platform": "esp32-idf",
+                "use_merged_config": "true",
+            },
+            id="variant_tests",
+        ),
+        # release* and beta* branches would build all components at once
+        pytest.param(
+            {"wifi": ["test.esp32-idf.yaml"]},
+            ["esphome/components/wifi/wifi.cpp"],
+            "release",
+            {"should_run": "false"},
+            id="skips_release_branch",
+        ),
+        pytest.param(
+            {"wifi": ["test.esp32-idf.yaml"]},
+            ["esphome/components/wifi/wifi.cpp"],
+            "beta",
+            {"should_run": "false"},
+            id="skips_beta_branch",
+        ),
+        pytest.param(
+            {"wifi": ["test.esp32-idf.yaml"]},
+            ["esphome/components/wifi/wifi.cpp"],
+            "dev",
+            {
+                "should_run": "true",
+                "components": ["wifi"],
+                "platform": "esp32-idf",
+                "use_merged_config": "true",
+            },
+            id="runs_for_dev_branch",
+        ),
+    ],
+)
+def test_detect_memory_impact_config(
+    test_files: dict[str, list[str]],
+    changed: list[str],
+    target_branch: str,
+    expected: dict[str, str | list[str]],
+    mock_component_test_files: dict[str, list[str]],
+    changed_files_mock: Mock,
+) -> None:
+    """Test memory impact detection for a set of component test files and changes."""
+    mock_component_test_files.update(test_files)
 
+    changed_files_mock.return_value = changed
+    with patch.object(determine_jobs, "get_target_branch", return_value=target_branch):
         result = determine_jobs.detect_memory_impact_config()
 
-    # Python-only changes should NOT trigger memory impact analysis
-    assert result["should_run"] == "false"
+    assert result == expected
 
 
 @pytest.mark.usefixtures("mock_target_branch_dev")
-def test_detect_memory_impact_config_no_common_platform(tmp_path: Path) -> None:
+def test_detect_memory_impact_config_no_common_platform(
+    mock_component_test_files: dict[str, list[str]],
+    changed_files_mock: Mock,
+) -> None:
     """Test memory impact detection when components have no common platform."""
-    # Create test directory structure
-    tests_dir = tmp_path / "tests" / "components"
-
     # wifi component only has esp32-idf test
-    wifi_dir = tests_dir / "wifi"
-    wifi_dir.mkdir(parents=True)
-    (wifi_dir / "test.esp32-idf.yaml").write_text("test: wifi")
-
+    mock_component_test_files["wifi"] = ["test.esp32-idf.yaml"]
     # logger component only has esp8266-ard test
-    logger_dir = tests_dir / "logger"
-    logger_dir.mkdir(parents=True)
-    (logger_dir / "test.esp8266-ard.yaml").write_text("test: logger")
+    mock_component_test_files["logger"] = ["test.esp8266-ard.yaml"]
 
     # Mock changed_files to return both components
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-    ):
-        mock_changed_files.return_value = [
-            "esphome/components/wifi/wifi.cpp",
-            "esphome/components/logger/logger.cpp",
-        ]
+    changed_files_mock.return_value = [
+        "esphome/components/wifi/wifi.cpp",
+        "esphome/components/logger/logger.cpp",
+    ]
 
-        result = determine_jobs.detect_memory_impact_config()
+    result = determine_jobs.detect_memory_impact_config()
 
     # Should pick the most frequently supported platform
     assert result["should_run"] == "true"
     assert set(result["components"]) == {"wifi", "logger"}
     # When no common platform, picks most commonly supported
     # esp8266-ard is preferred over esp32-idf in the preference list
-    assert result["platform"] in ["esp32-idf", "esp8266-ard"]
-    assert result["use_merged_config"] == "true"
-
-
-def test_detect_memory_impact_config_no_changes(tmp_path: Path) -> None:
-    """Test memory impact detection when no files changed."""
-    # Mock changed_files to return empty list
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-    ):
-        mock_changed_files.return_value = []
-
-        result = determine_jobs.detect_memory_impact_config()
-
-    assert result["should_run"] == "false"
-
-
-def test_detect_memory_impact_config_no_components_with_tests(tmp_path: Path) -> None:
-    """Test memory impact detection when changed components have no tests."""
-    # Create test directory structure
-    tests_dir = tmp_path / "tests" / "components"
-
-    # Create component directory but no test files
-    custom_component_dir = tests_dir / "my_custom_component"
-    custom_component_dir.mkdir(parents=True)
-
-    # Mock changed_files to return component without tests
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-    ):
-        mock_changed_files.return_value = [
-            "esphome/components/my_custom_component/component.cpp",
-        ]
-
-        result = determine_jobs.detect_memory_impact_config()
-
-    assert result["should_run"] == "false"
-
-
-@pytest.mark.usefixtures("mock_target_branch_dev")
-def test_detect_memory_impact_config_includes_base_bus_components(
-    tmp_path: Path,
-) -> None:
-    """Test that base bus components (i2c, spi, uart) are included when directly changed.
-
-    Base bus components should be analyzed for memory impact when they are directly
-    changed, even though they are often used as dependencies. This ensures that
-    optimizations to base components (like using move semantics or initializer_list)
-    are properly measured.
-    """
-    # Create test directory structure
-    tests_dir = tmp_path / "tests" / "components"
-
-    # uart component (base bus component that should be included)
-    uart_dir = tests_dir / "uart"
-    uart_dir.mkdir(parents=True)
-    (uart_dir / "test.esp32-idf.yaml").write_text("test: uart")
-
-    # wifi component (regular component)
-    wifi_dir = tests_dir / "wifi"
-    wifi_dir.mkdir(parents=True)
-    (wifi_dir / "test.esp32-idf.yaml").write_text("test: wifi")
-
-    # Mock changed_files to return both uart and wifi
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-    ):
-        mock_changed_files.return_value = [
-            "esphome/components/uart/automation.h",  # Header file with inline code
-            "esphome/components/wifi/wifi.cpp",
-        ]
-
-        result = determine_jobs.detect_memory_impact_config()
-
-    # Should include both uart and wifi
-    assert result["should_run"] == "true"
-    assert set(result["components"]) == {"uart", "wifi"}
-    assert result["platform"] == "esp32-idf"  # Common platform
-
-
-@pytest.mark.usefixtures("mock_target_branch_dev")
-def test_detect_memory_impact_config_with_variant_tests(tmp_path: Path) -> None:
-    """Test memory impact detection for components with only variant test files.
-
-    This verifies that memory impact analysis works correctly for components like
-    improv_serial, ethernet, mdns, etc. which only have variant test files
-    (test-*.yaml) instead of base test files (test.*.yaml).
-    """
-    # Create test directory structure
-    tests_dir = tmp_path / "tests" / "components"
-
-    # improv_serial with only variant tests
-    improv_serial_dir = tests_dir / "improv_serial"
-    improv_serial_dir.mkdir(parents=True)
-    (improv_serial_dir / "test-uart0.esp32-idf.yaml").write_text("test: improv")
-    (improv_serial_dir / "test-uart0.esp8266-ard.yaml").write_text("test: improv")
-    (improv_serial_dir / "test-usb_cdc.esp32-s2-idf.yaml").write_text("test: improv")
-
-    # ethernet with only variant tests
-    ethernet_dir = tests_dir / "ethernet"
-    ethernet_dir.mkdir(parents=True)
-    (ethernet_dir / "test-manual_ip.esp32-idf.yaml").write_text("test: ethernet")
-    (ethernet_dir / "test-dhcp.esp32-c3-idf.yaml").write_text("test: ethernet")
-
-    # Mock changed_files to return both components
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-    ):
-        mock_changed_files.return_value = [
-            "esphome/components/improv_serial/improv_serial.cpp",
-            "esphome/components/ethernet/ethernet.cpp",
-        ]
-
-        result = determine_jobs.detect_memory_impact_config()
-
-    # Should detect both components even though they only have variant tests
-    assert result["should_run"] == "true"
-    assert set(result["components"]) == {"improv_serial", "ethernet"}
-    # Both components support esp32-idf
-    assert result["platform"] == "esp32-idf"
+    assert result["platform"] in NO_COMMON_PLATFORM_CANDIDATES
     assert result["use_merged_config"] == "true"
 
 
@@ -999,41 +831,24 @@ def test_detect_memory_impact_config_with_variant_tests(tmp_path: Path) -> None:
 
 
 def test_clang_tidy_mode_full_scan(
-    mock_should_run_integration_tests: Mock,
-    mock_should_run_clang_tidy: Mock,
-    mock_should_run_clang_format: Mock,
-    mock_should_run_python_linters: Mock,
-    mock_changed_files: Mock,
-    capsys: pytest.CaptureFixture[str],
+    main_mocks: SimpleNamespace,
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     """Test that full scan (hash changed) always uses split mode."""
     monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
 
-    mock_should_run_integration_tests.return_value = False
-    mock_should_run_clang_tidy.return_value = True
-    mock_should_run_clang_format.return_value = False
-    mock_should_run_python_linters.return_value = False
+    main_mocks.integration_tests.return_value = False
+    main_mocks.clang_tidy.return_value = True
+    main_mocks.clang_format.return_value = False
+    main_mocks.python_linters.return_value = False
 
     # Mock changed_files to return no component files
-    mock_changed_files.return_value = []
+    main_mocks.changed_files.return_value = []
 
     # Mock full scan (hash changed)
-    with (
-        patch("sys.argv", ["determine-jobs.py"]),
-        patch.object(determine_jobs, "_is_clang_tidy_full_scan", return_value=True),
-        patch.object(determine_jobs, "get_changed_components", return_value=[]),
-        patch.object(
-            determine_jobs, "filter_component_and_test_files", return_value=False
-        ),
-        patch.object(
-            determine_jobs, "get_components_with_dependencies", return_value=[]
-        ),
-    ):
-        determine_jobs.main()
+    main_mocks.clang_tidy_full_scan.return_value = True
 
-    captured = capsys.readouterr()
-    output = json.loads(captured.out)
+    output = determine_jobs.compute_jobs([])
 
     # Full scan should always use split mode
     assert output["clang_tidy_mode"] == "split"
@@ -1065,27 +880,22 @@ def test_clang_tidy_mode_targeted_scan(
     component_count: int,
     files_per_component: int,
     expected_mode: str,
-    mock_should_run_integration_tests: Mock,
-    mock_should_run_clang_tidy: Mock,
-    mock_should_run_clang_format: Mock,
-    mock_should_run_python_linters: Mock,
-    mock_changed_files: Mock,
-    capsys: pytest.CaptureFixture[str],
+    main_mocks: SimpleNamespace,
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     """Test clang-tidy mode selection based on files_to_check count."""
     monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
 
-    mock_should_run_integration_tests.return_value = False
-    mock_should_run_clang_tidy.return_value = True
-    mock_should_run_clang_format.return_value = False
-    mock_should_run_python_linters.return_value = False
+    main_mocks.integration_tests.return_value = False
+    main_mocks.clang_tidy.return_value = True
+    main_mocks.clang_format.return_value = False
+    main_mocks.python_linters.return_value = False
 
     # Create component names
     components = [f"comp{i}" for i in range(component_count)]
 
     # Mock changed_files to return component files
-    mock_changed_files.return_value = [
+    main_mocks.changed_files.return_value = [
         f"esphome/components/{comp}/file.cpp" for comp in components
     ]
 
@@ -1096,91 +906,47 @@ def test_clang_tidy_mode_targeted_scan(
         for i in range(files_per_component)
     }
 
-    # Create a mock that returns the cpp_files dict for any call
-    def mock_git_ls_files(patterns=None):
-        return cpp_files
-
-    with (
-        patch("sys.argv", ["determine-jobs.py"]),
-        patch.object(determine_jobs, "_is_clang_tidy_full_scan", return_value=False),
-        patch.object(determine_jobs, "git_ls_files", side_effect=mock_git_ls_files),
-        patch.object(determine_jobs, "get_changed_components", return_value=components),
-        patch.object(
-            determine_jobs,
-            "filter_component_and_test_files",
-            side_effect=lambda f: f.startswith("esphome/components/"),
-        ),
-        patch.object(
-            determine_jobs, "get_components_with_dependencies", return_value=components
-        ),
-    ):
-        determine_jobs.main()
+    # Return the cpp_files dict for any call
+    monkeypatch.setattr(determine_jobs, "git_ls_files", lambda patterns=None: cpp_files)
+    main_mocks.set_components(components, components)
 
-    captured = capsys.readouterr()
-    output = json.loads(captured.out)
+    output = determine_jobs.compute_jobs([])
 
     assert output["clang_tidy_mode"] == expected_mode
 
 
 def test_main_core_files_changed_still_detects_components(
-    mock_should_run_integration_tests: Mock,
-    mock_should_run_clang_tidy: Mock,
-    mock_should_run_clang_format: Mock,
-    mock_should_run_python_linters: Mock,
-    mock_changed_files: Mock,
+    main_mocks: SimpleNamespace,
     mock_determine_cpp_unit_tests: Mock,
-    capsys: pytest.CaptureFixture[str],
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     """Test that component changes are detected even when core files change."""
     monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
 
-    mock_should_run_integration_tests.return_value = True
-    mock_should_run_clang_tidy.return_value = True
-    mock_should_run_clang_format.return_value = True
-    mock_should_run_python_linters.return_value = True
+    main_mocks.integration_tests.return_value = True
+    main_mocks.clang_tidy.return_value = True
+    main_mocks.clang_format.return_value = True
+    main_mocks.python_linters.return_value = True
     mock_determine_cpp_unit_tests.return_value = (True, [])
 
-    mock_changed_files.return_value = [
+    main_mocks.changed_files.return_value = [
         "esphome/core/helpers.h",
         "esphome/components/select/select_traits.h",
         "esphome/components/select/select_traits.cpp",
         "esphome/components/api/api.proto",
     ]
 
-    with (
-        patch("sys.argv", ["determine-jobs.py"]),
-        patch.object(determine_jobs, "_is_clang_tidy_full_scan", return_value=False),
-        patch.object(determine_jobs, "get_changed_components", return_value=None),
-        patch.object(
-            determine_jobs,
-            "filter_component_and_test_files",
-            side_effect=lambda f: f.startswith("esphome/components/"),
-        ),
-        patch.object(
-            determine_jobs,
-            "get_components_with_dependencies",
-            side_effect=lambda files, deps: (
-                ["select", "api"]
-                if not deps
-                else ["select", "api", "bluetooth_proxy", "logger"]
-            ),
-        ),
-        patch.object(
-            determine_jobs,
-            "detect_memory_impact_config",
-            return_value={"should_run": "false"},
-        ),
-        patch.object(
-            determine_jobs,
-            "create_intelligent_batches",
-            return_value=([["select", "api", "bluetooth_proxy", "logger"]], {}),
-        ),
-    ):
-        determine_jobs.main()
+    # Core files changed, so get_changed_components() returns None
+    main_mocks.set_components(
+        None, ["select", "api"], ["select", "api", "bluetooth_proxy", "logger"]
+    )
+    monkeypatch.setattr(
+        determine_jobs,
+        "create_intelligent_batches",
+        lambda **kwargs: ([["select", "api", "bluetooth_proxy", "logger"]], {}),
+    )
 
-    captured = capsys.readouterr()
-    output = json.loads(captured.out)
+    output = determine_jobs.compute_jobs([])
 
     assert output["clang_tidy"] is True
     assert output["clang_tidy_mode"] == "split"
@@ -1191,41 +957,31 @@ def test_main_core_files_changed_still_detects_components(
 
 @pytest.mark.usefixtures("mock_target_branch_dev")
 def test_detect_memory_impact_config_filters_incompatible_esp32_on_esp8266(
-    tmp_path: Path,
+    mock_component_test_files: dict[str, list[str]],
+    changed_files_mock: Mock,
 ) -> None:
     """Test that ESP32 components are filtered out when ESP8266 platform is selected.
 
     This test verifies the fix for the issue where ESP32 components were being included
     when ESP8266 was selected as the platform, causing build failures in PR 10387.
     """
-    # Create test directory structure
-    tests_dir = tmp_path / "tests" / "components"
-
     # esp32 component only has esp32-idf tests (NOT compatible with esp8266)
-    esp32_dir = tests_dir / "esp32"
-    esp32_dir.mkdir(parents=True)
-    (esp32_dir / "test.esp32-idf.yaml").write_text("test: esp32")
-    (esp32_dir / "test.esp32-s3-idf.yaml").write_text("test: esp32")
-
+    mock_component_test_files["esp32"] = [
+        "test.esp32-idf.yaml",
+        "test.esp32-s3-idf.yaml",
+    ]
     # esp8266 component only has esp8266-ard test (NOT compatible with esp32)
-    esp8266_dir = tests_dir / "esp8266"
-    esp8266_dir.mkdir(parents=True)
-    (esp8266_dir / "test.esp8266-ard.yaml").write_text("test: esp8266")
+    mock_component_test_files["esp8266"] = ["test.esp8266-ard.yaml"]
 
     # Mock changed_files to return both esp32 and esp8266 component changes
     # Include esp8266-specific filename to trigger esp8266 platform hint
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-    ):
-        mock_changed_files.return_value = [
-            "tests/components/esp32/common.yaml",
-            "tests/components/esp8266/test.esp8266-ard.yaml",
-            "esphome/core/helpers_esp8266.h",  # ESP8266-specific file to hint platform
-        ]
+    changed_files_mock.return_value = [
+        "tests/components/esp32/common.yaml",
+        "tests/components/esp8266/test.esp8266-ard.yaml",
+        "esphome/core/helpers_esp8266.h",  # ESP8266-specific file to hint platform
+    ]
 
-        result = determine_jobs.detect_memory_impact_config()
+    result = determine_jobs.detect_memory_impact_config()
 
     # Memory impact should run
     assert result["should_run"] == "true"
@@ -1245,41 +1001,31 @@ def test_detect_memory_impact_config_filters_incompatible_esp32_on_esp8266(
 
 @pytest.mark.usefixtures("mock_target_branch_dev")
 def test_detect_memory_impact_config_filters_incompatible_esp8266_on_esp32(
-    tmp_path: Path,
+    mock_component_test_files: dict[str, list[str]],
+    changed_files_mock: Mock,
 ) -> None:
     """Test that ESP8266 components are filtered out when ESP32 platform is selected.
 
     This is the inverse of the ESP8266 test - ensures filtering works both ways.
     """
-    # Create test directory structure
-    tests_dir = tmp_path / "tests" / "components"
-
     # esp32 component only has esp32-idf tests (NOT compatible with esp8266)
-    esp32_dir = tests_dir / "esp32"
-    esp32_dir.mkdir(parents=True)
-    (esp32_dir / "test.esp32-idf.yaml").write_text("test: esp32")
-    (esp32_dir / "test.esp32-s3-idf.yaml").write_text("test: esp32")
-
+    mock_component_test_files["esp32"] = [
+        "test.esp32-idf.yaml",
+        "test.esp32-s3-idf.yaml",
+    ]
     # esp8266 component only has esp8266-ard test (NOT compatible with esp32)
-    esp8266_dir = tests_dir / "esp8266"
-    esp8266_dir.mkdir(parents=True)
-    (esp8266_dir / "test.esp8266-ard.yaml").write_text("test: esp8266")
+    mock_component_test_files["esp8266"] = ["test.esp8266-ard.yaml"]
 
     # Mock changed_files to return both esp32 and esp8266 component changes
     # Include MORE esp32-specific filenames to ensure esp32-idf wins the hint count
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-    ):
-        mock_changed_files.return_value = [
-            "tests/components/esp32/common.yaml",
-            "tests/components/esp8266/test.esp8266-ard.yaml",
-            "esphome/components/wifi/wifi_component_esp_idf.cpp",  # ESP-IDF hint
-            "esphome/components/ethernet/ethernet_esp32.cpp",  # ESP32 hint
-        ]
+    changed_files_mock.return_value = [
+        "tests/components/esp32/common.yaml",
+        "tests/components/esp8266/test.esp8266-ard.yaml",
+        "esphome/components/wifi/wifi_component_esp_idf.cpp",  # ESP-IDF hint
+        "esphome/components/ethernet/ethernet_esp32.cpp",  # ESP32 hint
+    ]
 
-        result = determine_jobs.detect_memory_impact_config()
+    result = determine_jobs.detect_memory_impact_config()
 
     # Memory impact should run
     assert result["should_run"] == "true"
@@ -1297,124 +1043,43 @@ def test_detect_memory_impact_config_filters_incompatible_esp8266_on_esp32(
     assert result["use_merged_config"] == "true"
 
 
-def test_detect_memory_impact_config_skips_release_branch(tmp_path: Path) -> None:
-    """Test that memory impact analysis is skipped for release* branches."""
-    # Create test directory structure with components that have tests
-    tests_dir = tmp_path / "tests" / "components"
-    wifi_dir = tests_dir / "wifi"
-    wifi_dir.mkdir(parents=True)
-    (wifi_dir / "test.esp32-idf.yaml").write_text("test: wifi")
-
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-        patch.object(determine_jobs, "get_target_branch", return_value="release"),
-    ):
-        mock_changed_files.return_value = ["esphome/components/wifi/wifi.cpp"]
-
-        result = determine_jobs.detect_memory_impact_config()
-
-    # Memory impact should be skipped for release branch
-    assert result["should_run"] == "false"
-
-
-def test_detect_memory_impact_config_skips_beta_branch(tmp_path: Path) -> None:
-    """Test that memory impact analysis is skipped for beta* branches."""
-    # Create test directory structure with components that have tests
-    tests_dir = tmp_path / "tests" / "components"
-    wifi_dir = tests_dir / "wifi"
-    wifi_dir.mkdir(parents=True)
-    (wifi_dir / "test.esp32-idf.yaml").write_text("test: wifi")
-
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-        patch.object(determine_jobs, "get_target_branch", return_value="beta"),
-    ):
-        mock_changed_files.return_value = ["esphome/components/wifi/wifi.cpp"]
-
-        result = determine_jobs.detect_memory_impact_config()
-
-    # Memory impact should be skipped for beta branch
-    assert result["should_run"] == "false"
-
-
-def test_detect_memory_impact_config_runs_for_dev_branch(tmp_path: Path) -> None:
-    """Test that memory impact analysis runs for dev branch."""
-    # Create test directory structure with components that have tests
-    tests_dir = tmp_path / "tests" / "components"
-    wifi_dir = tests_dir / "wifi"
-    wifi_dir.mkdir(parents=True)
-    (wifi_dir / "test.esp32-idf.yaml").write_text("test: wifi")
-
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-        patch.object(determine_jobs, "get_target_branch", return_value="dev"),
-    ):
-        mock_changed_files.return_value = ["esphome/components/wifi/wifi.cpp"]
-
-        result = determine_jobs.detect_memory_impact_config()
-
-    # Memory impact should run for dev branch
-    assert result["should_run"] == "true"
-    assert result["components"] == ["wifi"]
-
-
+@pytest.mark.usefixtures("mock_target_branch_dev")
 def test_detect_memory_impact_config_skips_too_many_components(
-    tmp_path: Path,
+    mock_component_test_files: dict[str, list[str]],
+    changed_files_mock: Mock,
 ) -> None:
     """Test that memory impact analysis is skipped when more than 40 components changed."""
-    # Create test directory structure with 41 components
-    tests_dir = tmp_path / "tests" / "components"
+    # 41 components with tests
     component_names = [f"component_{i}" for i in range(41)]
-
     for component_name in component_names:
-        comp_dir = tests_dir / component_name
-        comp_dir.mkdir(parents=True)
-        (comp_dir / "test.esp32-idf.yaml").write_text(f"test: {component_name}")
+        mock_component_test_files[component_name] = ["test.esp32-idf.yaml"]
 
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-        patch.object(determine_jobs, "get_target_branch", return_value="dev"),
-    ):
-        mock_changed_files.return_value = [
-            f"esphome/components/{name}/{name}.cpp" for name in component_names
-        ]
+    changed_files_mock.return_value = [
+        f"esphome/components/{name}/{name}.cpp" for name in component_names
+    ]
 
-        result = determine_jobs.detect_memory_impact_config()
+    result = determine_jobs.detect_memory_impact_config()
 
     # Memory impact should be skipped for too many components (41 > 40)
     assert result["should_run"] == "false"
 
 
-def test_detect_memory_impact_config_runs_at_component_limit(tmp_path: Path) -> None:
+@pytest.mark.usefixtures("mock_target_branch_dev")
+def test_detect_memory_impact_config_runs_at_component_limit(
+    mock_component_test_files: dict[str, list[str]],
+    changed_files_mock: Mock,
+) -> None:
     """Test that memory impact analysis runs with exactly 40 components (at limit)."""
-    # Create test directory structure with exactly 40 components
-    tests_dir = tmp_path / "tests" / "components"
+    # Exactly 40 components with tests
     component_names = [f"component_{i}" for i in range(40)]
-
     for component_name in component_names:
-        comp_dir = tests_dir / component_name
-        comp_dir.mkdir(parents=True)
-        (comp_dir / "test.esp32-idf.yaml").write_text(f"test: {component_name}")
+        mock_component_test_files[component_name] = ["test.esp32-idf.yaml"]
 
-    with (
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "changed_files") as mock_changed_files,
-        patch.object(determine_jobs, "get_target_branch", return_value="dev"),
-    ):
-        mock_changed_files.return_value = [
-            f"esphome/components/{name}/{name}.cpp" for name in component_names
-        ]
+    changed_files_mock.return_value = [
+        f"esphome/components/{name}/{name}.cpp" for name in component_names
+    ]
 
-        result = determine_jobs.detect_memory_impact_config()
+    result = determine_jobs.detect_memory_impact_config()
 
     # Memory impact should run at exactly 40 components (at limit but not over)
     assert result["should_run"] == "true"
@@ -1422,14 +1087,10 @@ def test_detect_memory_impact_config_runs_at_component_limit(tmp_path: Path) ->
 
 
 def test_component_batching_beta_branch_40_per_batch(
-    tmp_path: Path,
-    mock_should_run_integration_tests: Mock,
-    mock_should_run_clang_tidy: Mock,
-    mock_should_run_clang_format: Mock,
-    mock_should_run_python_linters: Mock,
-    mock_changed_files: Mock,
+    components_tree: Path,
+    main_mocks: SimpleNamespace,
     mock_determine_cpp_unit_tests: Mock,
-    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     """Test that beta/release branches create batches with 40 actual components each.
 
@@ -1437,63 +1098,31 @@ def test_component_batching_beta_branch_40_per_batch(
     and each batch should contain 40 actual components with weight 1 each.
     This matches the original behavior before consolidation.
     """
-    # Create 120 test components with test files
-    component_names = [f"comp_{i:03d}" for i in range(120)]
-    tests_dir = tmp_path / "tests" / "components"
-
-    for comp in component_names:
-        comp_dir = tests_dir / comp
-        comp_dir.mkdir(parents=True)
-        (comp_dir / "test.esp32-idf.yaml").write_text(f"# Test for {comp}")
+    # 120 test components with test files in the shared tree
+    component_names = BATCHING_COMPONENTS
 
     # Setup mocks
-    mock_should_run_integration_tests.return_value = False
-    mock_should_run_clang_tidy.return_value = False
-    mock_should_run_clang_format.return_value = False
-    mock_should_run_python_linters.return_value = False
+    main_mocks.integration_tests.return_value = False
+    main_mocks.clang_tidy.return_value = False
+    main_mocks.clang_format.return_value = False
+    main_mocks.python_linters.return_value = False
     mock_determine_cpp_unit_tests.return_value = (False, [])
 
     # Mock changed_files to return all component files
     changed_files = [
         f"esphome/components/{comp}/{comp}.cpp" for comp in component_names
     ]
-    mock_changed_files.return_value = changed_files
+    main_mocks.changed_files.return_value = changed_files
 
     # Run main function with beta branch
     # Don't mock create_intelligent_batches - that's what we're testing!
-    with (
-        patch("sys.argv", ["determine-jobs.py", "--branch", "beta"]),
-        patch.object(determine_jobs, "root_path", str(tmp_path)),
-        patch.object(helpers, "root_path", str(tmp_path)),
-        patch.object(script.helpers, "root_path", str(tmp_path)),
-        patch.object(determine_jobs, "get_target_branch", return_value="beta"),
-        patch.object(determine_jobs, "_is_clang_tidy_full_scan", return_value=False),
-        patch.object(
-            determine_jobs,
-            "get_changed_components",
-            return_value=component_names,
-        ),
-        patch.object(
-            determine_jobs,
-            "filter_component_and_test_files",
-            side_effect=lambda f: f.startswith("esphome/components/"),
-        ),
-        patch.object(
-            determine_jobs,
-            "get_components_with_dependencies",
-            side_effect=lambda files, deps: component_names,
-        ),
-        patch.object(
-            determine_jobs,
-            "detect_memory_impact_config",
-            return_value={"should_run": "false"},
-        ),
-    ):
-        determine_jobs.main()
+    monkeypatch.setattr(determine_jobs, "root_path", str(components_tree))
+    monkeypatch.setattr(helpers, "root_path", str(components_tree))
+    monkeypatch.setattr(script.helpers, "root_path", str(components_tree))
+    monkeypatch.setattr(determine_jobs, "get_target_branch", lambda: "beta")
+    main_mocks.set_components(component_names, component_names)
 
-    # Check output
-    captured = capsys.readouterr()
-    output = json.loads(captured.out)
+    output = determine_jobs.compute_jobs(["--branch", "beta"])
 
     # Verify batches are present and properly sized
     assert "component_test_batches" in output
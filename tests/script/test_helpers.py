@@ -31,11 +31,20 @@ print_file_list = helpers.print_file_list
 get_all_dependencies = helpers.get_all_dependencies
 
 
-@pytest.fixture(autouse=True)
-def clear_helpers_cache() -> None:
-    """Clear cached functions before each test."""
+def _clear_helpers_caches() -> None:
+    """Clear all cached functions in helpers."""
     helpers._get_github_event_data.cache_clear()
     helpers._get_changed_files_github_actions.cache_clear()
+    helpers._changed_files.cache_clear()
+    helpers.get_components_graph_cache_key.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_helpers_caches() -> Generator[None, None, None]:
+    """Clear all cached functions before and after each test."""
+    _clear_helpers_caches()
+    yield
+    _clear_helpers_caches()
 
 
 @pytest.mark.parametrize(
@@ -163,14 +172,6 @@ def test_github_actions_push_event(monkeypatch: MonkeyPatch) -> None:
         assert result == expected_files
 
 
-@pytest.fixture(autouse=True)
-def clear_caches():
-    """Clear function caches before each test."""
-    # Clear the cache for _get_changed_files_github_actions
-    _get_changed_files_github_actions.cache_clear()
-    yield
-
-
 def test_get_changed_files_github_actions_pull_request(
     monkeypatch: MonkeyPatch,
 ) -> None:
@@ -387,6 +388,27 @@ def test_local_development_no_remotes_configured(monkeypatch: MonkeyPatch) -> No
             changed_files()
 
 
+def test_changed_files_cached_per_branch(monkeypatch: MonkeyPatch) -> None:
+    """Test that git is only queried once per branch."""
+    monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
+
+    with (
+        patch("helpers.get_output", return_value="abc123\n") as mock_output,
+        patch(
+            "helpers._get_changed_files_from_command", return_value=["file1.py"]
+        ) as mock_get,
+    ):
+        assert changed_files() == ["file1.py"]
+        assert changed_files(None) == ["file1.py"]
+        assert changed_files("dev") == ["file1.py"]
+        assert mock_get.call_count == 1
+        output_calls = mock_output.call_count
+
+        changed_files("release")
+        assert mock_get.call_count == 2
+        assert mock_output.call_count > output_calls
+
+
 @pytest.mark.parametrize(
     ("stdout", "expected"),
     [
@@ -1116,6 +1138,78 @@ def test_get_component_from_path(
     assert result == expected_component
 
 
+@pytest.mark.parametrize(
+    ("file_path", "expected"),
+    [
+        ("esphome/components/wifi/wifi.cpp", True),
+        ("esphome/components/wifi/__init__.py", True),
+        ("tests/components/wifi/test.esp32-idf.yaml", True),
+        ("tests/components/wifi/common.yml", True),
+        ("tests/components/uart/test_uart.cpp", True),
+        ("esphome/core/helpers.cpp", False),
+        ("tests/unit_tests/test_core.py", False),
+        ("script/helpers.py", False),
+    ],
+)
+def test_filter_component_and_test_files(file_path: str, expected: bool) -> None:
+    """Test filtering of component and component test files."""
+    assert helpers.filter_component_and_test_files(file_path) is expected
+
+
+def test_get_components_with_dependencies_expands_graph() -> None:
+    """Test that dependent components are added when requested."""
+    graph = {"sensor": ["bme280", "dht"], "i2c": ["bme280"]}
+    with patch.object(helpers, "create_components_graph", return_value=graph):
+        result = helpers.get_components_with_dependencies(
+            ["esphome/components/sensor/sensor.cpp"], True
+        )
+
+    assert result == ["bme280", "dht", "sensor"]
+
+
+def test_get_components_with_dependencies_shared_and_cyclic_dependents() -> None:
+    """Test that shared and cyclic dependents are expanded once and terminate."""
+    graph = {
+        "i2c": ["bme280", "sensor_hub"],
+        "uart": ["sensor_hub"],
+        "sensor_hub": ["display", "uart"],
+        "display": ["i2c"],
+    }
+    with patch.object(helpers, "create_components_graph", return_value=graph):
+        result = helpers.get_components_with_dependencies(
+            [
+                "esphome/components/i2c/i2c.cpp",
+                "esphome/components/uart/uart.cpp",
+            ],
+            True,
+        )
+
+    assert result == ["bme280", "display", "i2c", "sensor_hub", "uart"]
+
+
+def test_find_children_of_component_deep_and_cyclic() -> None:
+    """Test that dependents are found past any depth and cycles terminate."""
+    graph = {f"c{i}": [f"c{i + 1}"] for i in range(15)}
+    graph["c15"] = ["c0"]
+
+    result = helpers.find_children_of_component(graph, "c0")
+
+    assert sorted(result) == sorted(f"c{i}" for i in range(16))
+    assert helpers.find_children_of_component(graph, "missing") == []
+
+
+@pytest.mark.parametrize("get_dependencies", [False, True])
+def test_get_components_with_dependencies_skips_graph(get_dependencies: bool) -> None:
+    """Test that the components graph is not built when it is not needed."""
+    with patch.object(helpers, "create_components_graph") as mock_graph:
+        result = helpers.get_components_with_dependencies(
+            ["esphome/core/helpers.cpp", "README.md"], get_dependencies
+        )
+
+    assert result == []
+    mock_graph.assert_not_called()
+
+
 # Components graph cache tests
 
 
@@ -1142,12 +1236,6 @@ def mock_cache_file(tmp_path: Path) -> Path:
     return tmp_path / "components_graph.json"
 
 
-@pytest.fixture(autouse=True)
-def clear_cache_key_cache() -> None:
-    """Clear the components graph cache key cache before each test."""
-    helpers.get_components_graph_cache_key.cache_clear()
-
-
 @pytest.fixture
 def mock_subprocess_run() -> Generator[Mock, None, None]:
     """Fixture to mock subprocess.run for git commands."""